@@ -5,9 +5,13 @@ import json
 import os
 import uuid
 import sys
-import psycopg2
+import psycopg
+import orjson
 import traceback
-from psycopg2.extras import Json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from psycopg.types.json import Jsonb, set_json_dumps, set_json_loads
+from psycopg_pool import ConnectionPool
 from datetime import datetime
 
 if sys.stdout is None:
@@ -15,6 +19,10 @@ if sys.stdout is None:
 if sys.stderr is None:
     sys.stderr = open(os.devnull, 'w')
 
+# Payload (de)serialisation is the per-row cost of a full load; orjson is several times faster than stdlib json.
+set_json_dumps(orjson.dumps)
+set_json_loads(orjson.loads)
+
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("dark-blue")
 
@@ -54,6 +62,191 @@ COLOR_ACCENT_LINE = "#2A2A3A"
 DEFAULT_USD_RATE = 200.0
 DEFAULT_EUR_RATE = 230.0
 
+# prepare_threshold: statements repeated on a connection (inserts, the version check) get server-side prepared.
+DB_KWARGS = {"prepare_threshold": 3, "keepalives": 1, "keepalives_idle": 30, "connect_timeout": 5}
+
+
+# Payload values that don't parse become NULL (summed as 0, like the old float() fallback) instead of
+# failing the whole ALTER / INSERT; numeric strings are accepted, as float() accepted them.
+def _num_sql(k):
+    v = f"payload->>'{k}'"
+    return (f"CASE WHEN jsonb_typeof(payload->'{k}') = 'number' THEN ({v})::float8 "
+            rf"WHEN {v} ~ '^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$' THEN ({v})::float8 END")
+
+
+GENERATED_NUM_COLS = ("amount", "net_amount", "amount_usd", "amount_eur", "amount_dzd", "amount_sent", "amount_received")
+# Truthiness as Python saw it: false/0/""/null/missing are false.
+TO_PAYPAL_SQL = ("CASE COALESCE(jsonb_typeof(payload->'to_paypal'), 'null') WHEN 'boolean' THEN (payload->'to_paypal')::bool "
+                 "WHEN 'number' THEN (payload->>'to_paypal')::numeric <> 0 WHEN 'string' THEN payload->>'to_paypal' <> '' "
+                 "WHEN 'null' THEN false ELSE true END")
+
+# Sent as one statement batch so startup pays a single round-trip.
+SCHEMA_SQL = f"""
+CREATE TABLE IF NOT EXISTS settings (key VARCHAR(50) PRIMARY KEY, value FLOAT);
+CREATE TABLE IF NOT EXISTS transactions (id VARCHAR(255) PRIMARY KEY, t_date VARCHAR(50), t_type VARCHAR(50), payload JSONB);
+CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v BIGINT NOT NULL);
+INSERT INTO settings (key, value) VALUES ('display_rate', {DEFAULT_USD_RATE}), ('display_rate_eur', {DEFAULT_EUR_RATE}) ON CONFLICT DO NOTHING;
+INSERT INTO meta (k, v) VALUES ('tx_version', 0) ON CONFLICT DO NOTHING;
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS t_month TEXT GENERATED ALWAYS AS (substring(t_date, 1, 7)) STORED;
+CREATE INDEX IF NOT EXISTS ix_tx_date ON transactions (t_date);
+ALTER TABLE transactions
+    ADD COLUMN IF NOT EXISTS currency TEXT GENERATED ALWAYS AS (payload->>'currency') STORED,
+    ADD COLUMN IF NOT EXISTS status TEXT GENERATED ALWAYS AS (payload->>'status') STORED,
+    ADD COLUMN IF NOT EXISTS to_paypal BOOLEAN GENERATED ALWAYS AS ({TO_PAYPAL_SQL}) STORED,
+    {("," + chr(10) + "    ").join(f"ADD COLUMN IF NOT EXISTS {k} FLOAT8 GENERATED ALWAYS AS ({_num_sql(k)}) STORED" for k in GENERATED_NUM_COLS)};
+"""
+
+ZERO_TOTALS = {
+    "usd": 0.0, "eur": 0.0, "dzd": 0.0, "paypal": 0.0,
+    "usd_locked": 0.0, "eur_locked": 0.0, "dzd_locked": 0.0,
+    "lent_usd": 0.0, "lent_eur": 0.0, "lent_dzd": 0.0,
+}
+ZERO_MONTH = {
+    "m_earn_usd": 0.0, "m_earn_eur": 0.0, "m_earn_dzd": 0.0,
+    "m_spend_usd": 0.0, "m_spend_eur": 0.0, "m_spend_dzd": 0.0,
+}
+
+# One row per (month, type, currency, paypal flag, loan status) with the summed amounts, so the
+# balances can be seeded without walking every payload in Python. Rows are shaped like a
+# transaction (see fetch_data_from_db) and fed straight through TX_EFFECTS. Reads the generated
+# columns from SCHEMA_SQL rather than re-parsing payload JSONB per row.
+STATS_SQL = """
+SELECT t_month, t_type,
+       CASE WHEN currency IN ('EUR', 'DZD') THEN currency ELSE 'USD' END,
+       COALESCE(to_paypal, false),
+       COALESCE(status, 'active'),
+       SUM(COALESCE(amount, 0)),
+       SUM(COALESCE(NULLIF(net_amount, 0), amount, 0)),
+       SUM(COALESCE(amount_usd, 0)),
+       SUM(COALESCE(amount_eur, 0)),
+       SUM(COALESCE(amount_dzd, 0)),
+       SUM(COALESCE(amount_sent, 0)),
+       SUM(COALESCE(amount_received, 0))
+FROM transactions
+GROUP BY 1, 2, 3, 4, 5
+"""
+STATS_SUM_KEYS = ("amount", "net_amount", "amount_usd", "amount_eur", "amount_dzd", "amount_sent", "amount_received")
+
+INSERT_TX_SQL = "INSERT INTO transactions (id, t_date, t_type, payload) VALUES (%s, %s, %s, %s)"
+UPDATE_TX_SQL = "UPDATE transactions SET payload = %s WHERE id = %s"
+# Imports of at least this many rows go through COPY into a temp table instead of a pipelined executemany.
+COPY_IMPORT_MIN = 1000
+
+
+# Payload fields that are coerced to float once at load (see _normalize), so the hot paths can
+# read them with a plain dict lookup. 'rate' is left alone: it is only ever displayed as entered.
+NUMERIC_FIELDS = ("amount", "net_amount", "fee_amount", "fee_paid", "amount_usd", "amount_eur", "amount_dzd", "amount_sent", "amount_received")
+
+
+def _normalize(t):
+    for k in NUMERIC_FIELDS:
+        if k in t:
+            try: t[k] = float(t[k])
+            except: t[k] = 0.0
+    return t
+
+
+def _payload(t):
+    """The JSON stored for t, without client-side cache keys (those start with '_')."""
+    return Jsonb({k: v for k, v in t.items() if not k.startswith('_')})
+
+
+def _tx_row(t):
+    return t['id'], t['date'], t['type'], _payload(t)
+
+
+def _month_key(date):
+    """'YYYY-MM...' -> year*12 + month; month buckets are keyed on this int rather than a sliced string."""
+    try: return int(date[:4]) * 12 + int(date[5:7])
+    except (TypeError, ValueError): return 0
+
+
+def _sf(t, k):
+    return t.get(k) or 0.0
+
+
+# type -> fn(t, bal_key, base, net) returning [(stat_key, delta), ...] on the lifetime balances
+TX_EFFECTS = {
+    'income': lambda t, bk, base, net: [('paypal' if t.get('to_paypal') and t.get('currency', 'USD') == 'USD' else bk, net)],
+    'expense': lambda t, bk, base, net: [(bk, -base)],
+    'transfer_usd_dzd': lambda t, bk, base, net: [('usd', -_sf(t, 'amount_usd')), ('dzd', _sf(t, 'amount_dzd'))],
+    'transfer_eur_dzd': lambda t, bk, base, net: [('eur', -_sf(t, 'amount_eur')), ('dzd', _sf(t, 'amount_dzd'))],
+    'transfer_dzd_eur': lambda t, bk, base, net: [('dzd', -_sf(t, 'amount_dzd')), ('eur', _sf(t, 'amount_eur'))],
+    'transfer_paypal_bank': lambda t, bk, base, net: [('paypal', -_sf(t, 'amount_sent')), ('usd', _sf(t, 'amount_received'))],
+    'savings_deposit': lambda t, bk, base, net: [(bk, -base), (bk + "_locked", base)],
+    'savings_withdraw': lambda t, bk, base, net: [(bk, base), (bk + "_locked", -base)],
+    'loan_out': lambda t, bk, base, net: [(bk, -base)] + ([("lent_" + bk, base)] if t.get('status', 'active') == 'active' else []),
+    'loan_repaid': lambda t, bk, base, net: [(bk, base)],
+}
+
+
+class VirtualListFrame(ctk.CTkScrollableFrame):
+    """CTkScrollableFrame that only materialises the rows intersecting the viewport.
+
+    Rows are keyed by transaction id and reused between set_items calls. Everything
+    outside the visible window is stood in for by two spacer frames sized to
+    row_height * hidden rows, so the scrollbar still reflects the full list.
+
+    Hooks CTkScrollableFrame's private _parent_canvas / _scrollbar, hence the exact
+    customtkinter pin in requirements.txt; re-check this class when bumping it.
+    """
+    BUFFER = 6
+
+    def __init__(self, master, make_row, update_row, **kw):
+        super().__init__(master, **kw)
+        self._make_row = make_row; self._update_row = update_row
+        self._items = []; self._live = {}; self._shown = None; self._window = None
+        self._row_h = None; self._empty = None; self._pending = None
+        bg = tk.Frame.cget(self, "bg")
+        self._top = tk.Frame(self, height=0, bg=bg, highlightthickness=0)
+        self._bottom = tk.Frame(self, height=0, bg=bg, highlightthickness=0)
+        self._parent_canvas.configure(yscrollcommand=self._on_yscroll)
+
+    def set_items(self, items, empty_msg, empty_pady=30):
+        self._items = items; self._window = None
+        if items and self._empty is not None: self._empty.destroy(); self._empty = None
+        elif not items and self._empty is None:
+            self._empty = ctk.CTkLabel(self, text=empty_msg, font=FONT_MAIN, text_color=COLOR_TEXT_DIM); self._empty.pack(pady=empty_pady)
+        self._render()
+
+    def _on_yscroll(self, first, last):
+        self._scrollbar.set(first, last)
+        if self._pending is None: self._pending = self.after_idle(self._on_scrolled)
+
+    def _on_scrolled(self):
+        self._pending = None; self._render()
+
+    def _render(self):
+        n = len(self._items)
+        if n and self._row_h is None:
+            row = self._live.get(self._items[0].get('id','')) or self._make_row(self, self._items[0])
+            self._live[self._items[0].get('id','')] = row
+            row.update_idletasks(); self._row_h = max(row.winfo_reqheight(), 1) + 6
+        row_h = self._row_h or 1
+        first = int(self._parent_canvas.yview()[0] * n)
+        visible = self._parent_canvas.winfo_height() // row_h + 1
+        start = max(0, first - self.BUFFER); end = min(n, first + visible + self.BUFFER)
+        if (start, end, n) == self._window: return
+        self._window = (start, end, n)
+        rows = self._items[start:end]; ids = [t.get('id','') for t in rows]; wanted = set(ids)
+        for tid in [k for k in self._live if k not in wanted]: self._live.pop(tid).destroy()
+        for t in rows:
+            row = self._live.get(t.get('id',''))
+            if row is None: self._live[t.get('id','')] = self._make_row(self, t)
+            else: self._update_row(row, t)
+        self._top.configure(height=start * row_h); self._bottom.configure(height=(n - end) * row_h)
+        if ids != self._shown:
+            for w in (self._top, *self._live.values(), self._bottom): w.pack_forget()
+            if start: self._top.pack(fill="x")
+            for tid in ids: self._live[tid].pack(fill="x", pady=3)
+            if end < n: self._bottom.pack(fill="x")
+            self._shown = ids
+        else:
+            if start: self._top.pack(fill="x", before=self._live[ids[0]])
+            else: self._top.pack_forget()
+            if end < n: self._bottom.pack(fill="x", after=self._live[ids[-1]])
+            else: self._bottom.pack_forget()
+
 
 class FinancialTrackerApp(ctk.CTk):
     def __init__(self):
@@ -65,60 +258,132 @@ class FinancialTrackerApp(ctk.CTk):
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
         self.db_url = ""
-        self.data = {"settings": {"display_rate": DEFAULT_USD_RATE, "display_rate_eur": DEFAULT_EUR_RATE}, "transactions": []}
+        self.data = {"settings": {"display_rate": DEFAULT_USD_RATE, "display_rate_eur": DEFAULT_EUR_RATE}}
+        self.tx_by_id = {}
+        self._last_labels = {}
+        self._refresh_pending = None
+        self._current_frame = None
+        self._dirty = set()
         self.config_file = os.path.expanduser("~/finance_tracker_db_config.json")
         self.frames = {}
         self.nav_buttons = {}
-        self._db_conn = None
-        self._cached_stats = None
+        self.pool = None
+        self.totals = dict(ZERO_TOTALS)
+        self.monthly_totals = {}
+        self.by_month = {}
+        self._tx_version = None
+        self._saving = False  # a form save is in flight; further submits are ignored until it lands
+        self._write_floor = 0  # newest version written by this client; older snapshots are stale
+        self._connect_seq = 0
+        self._retry_id = None
+        self._db_exec = ThreadPoolExecutor(max_workers=4, thread_name_prefix="db")
         self.after(100, self.check_db_connection)
 
     # ================================================================
     # DB
     # ================================================================
-    def get_db_connection(self):
-        try:
-            if self._db_conn is None or self._db_conn.closed:
-                self._db_conn = psycopg2.connect(self.db_url)
-                self._db_conn.autocommit = False
-            else:
-                self._db_conn.isolation_level
-        except Exception:
-            try:
-                self._db_conn = psycopg2.connect(self.db_url)
-                self._db_conn.autocommit = False
-            except Exception as e:
-                self.show_error_native(f"DB connection lost:\n{e}")
-                raise
-        return self._db_conn
+    def open_pool(self, url):
+        """Make sure the schema exists, then start and return a new pool (the caller installs it); raises with the driver's error if the DB is unreachable."""
+        with psycopg.connect(url, **DB_KWARGS) as conn, conn.cursor() as cur: self.ensure_schema(cur)
+        return ConnectionPool(url, min_size=1, max_size=4, kwargs=DB_KWARGS, open=True)
+
+    @contextmanager
+    def db_cursor(self):
+        """Borrow a pooled connection for one transaction: commits on success, rolls back on error."""
+        with self.pool.connection() as conn, conn.cursor() as cur: yield cur
 
     def close_db_connection(self):
-        if self._db_conn and not self._db_conn.closed:
-            try:
-                self._db_conn.close()
-            except Exception:
-                pass
-        self._db_conn = None
+        if self.pool is not None:
+            try: self.pool.close()
+            except Exception: pass
+        self.pool = None
 
     def destroy(self):
+        self._db_exec.shutdown(wait=False, cancel_futures=True)
         self.close_db_connection()
         super().destroy()
 
+    def _submit(self, fn, on_done=None, on_error=None):
+        """Run fn() on the DB worker thread; on_done(result) / on_error(exc) are called back on the Tk thread."""
+        def finished(fut):
+            try:
+                try: res = fut.result()
+                except Exception as e: self.after(0, on_error or (lambda e: self.show_error_native(f"Database error:\n{e}")), e)
+                else:
+                    if on_done: self.after(0, on_done, res)
+            except (RuntimeError, tk.TclError):
+                pass  # app closed while the query was in flight
+        self._db_exec.submit(fn).add_done_callback(finished)
+
+    def ensure_schema(self, cur):
+        cur.execute(SCHEMA_SQL)
+
+    def _bump_version(self, cur):
+        """Bump the shared change counter inside the caller's transaction; returns the new value."""
+        cur.execute("UPDATE meta SET v = v + 1 WHERE k = 'tx_version' RETURNING v")
+        return cur.fetchone()[0]
+
+    def _saw_own_write(self, v):
+        """Note our committed write v; False if the loaded snapshot already includes it, so it must not be applied again."""
+        self._write_floor = max(self._write_floor, v)
+        if self._tx_version is not None and v <= self._tx_version: return False
+        # Only fast-forward if nobody else wrote in between; otherwise the next show_frame reloads.
+        if self._tx_version is not None and v == self._tx_version + 1: self._tx_version = v
+        return True
+
+    def remote_version(self):
+        with self.db_cursor() as cur:
+            cur.execute("SELECT v FROM meta WHERE k = 'tx_version'")
+            row = cur.fetchone()
+        return row[0] if row else None
+
     # ================================================================
     # STARTUP
     # ================================================================
-    def check_db_connection(self):
+    def _load_config(self):
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, "r") as f:
-                    self.db_url = json.load(f).get("db_url", "").strip()
-                if self.db_url:
-                    c = psycopg2.connect(self.db_url); c.close()
-                    self.start_full_app(); return
-            self.show_setup_screen()
-        except Exception as e:
-            messagebox.showerror("Connection Error", f"{e}")
-            self.show_setup_screen()
+            with open(self.config_file, "r") as f: return json.load(f).get("db_url", "").strip()
+        except (OSError, ValueError): return ""
+
+    def check_db_connection(self):
+        self.db_url = self._load_config()
+        if not self.db_url: self.show_setup_screen(); return
+        self.show_connecting_screen()
+        self._attempt_connect(self.db_url, self.start_full_app, self._on_connect_failed)
+
+    def _attempt_connect(self, url, on_ok, on_fail):
+        """Open a pool off the Tk thread and install it on the Tk thread; a superseded attempt closes its pool and skips on_ok() / on_fail(exc)."""
+        self._connect_seq += 1; seq = self._connect_seq
+        def done(pool):
+            if seq != self._connect_seq: pool.close(); return
+            self.close_db_connection(); self.pool = pool; on_ok()
+        def failed(e):
+            if seq == self._connect_seq: on_fail(e)
+        self._submit(lambda: self.open_pool(url), done, failed)
+
+    def _on_connect_failed(self, e):
+        self.lbl_connect_status.configure(text=f"{e}\nRetrying in 2 seconds...", text_color=COLOR_DANGER)
+        self._retry_id = self.after(2000, self._retry_connect)
+
+    def _retry_connect(self):
+        self._retry_id = None
+        self.lbl_connect_status.configure(text="Connecting...", text_color=COLOR_WARNING)
+        self._attempt_connect(self.db_url, self.start_full_app, self._on_connect_failed)
+
+    def _change_database(self):
+        self._connect_seq += 1  # drop any attempt still in flight
+        if self._retry_id is not None: self.after_cancel(self._retry_id); self._retry_id = None
+        self.show_setup_screen()
+
+    def show_connecting_screen(self):
+        for w in self.winfo_children(): w.destroy()
+        self.grid_columnconfigure(0, weight=1)
+        outer = ctk.CTkFrame(self, fg_color="transparent"); outer.grid(row=0, column=0)
+        card = ctk.CTkFrame(outer, fg_color=COLOR_CARD, corner_radius=24, border_width=1, border_color=COLOR_BORDER); card.pack(padx=60, pady=60)
+        ctk.CTkFrame(card, fg_color=COLOR_PRIMARY, height=4, corner_radius=2).pack(fill="x", padx=30, pady=(30, 0))
+        ctk.CTkLabel(card, text="Connecting to Database", font=("Segoe UI Bold", 24), text_color=COLOR_TEXT_MAIN).pack(padx=40, pady=(20, 5))
+        self.lbl_connect_status = ctk.CTkLabel(card, text="Connecting...", font=FONT_BOLD, text_color=COLOR_WARNING, wraplength=460); self.lbl_connect_status.pack(padx=40, pady=(10, 15))
+        ctk.CTkButton(card, text="Change Database", width=220, height=48, corner_radius=14, font=FONT_BOLD, fg_color=COLOR_INPUT, hover_color=COLOR_BORDER, command=self._change_database).pack(pady=(10, 35))
 
     def show_setup_screen(self):
         for w in self.winfo_children(): w.destroy()
@@ -137,30 +402,23 @@ class FinancialTrackerApp(ctk.CTk):
         url = self.entry_db_url.get().strip()
         if not url: self.lbl_setup_error.configure(text="Enter a valid URL."); return
         if "sslmode=require" not in url: url += "&sslmode=require" if "?" in url else "?sslmode=require"
-        self.lbl_setup_error.configure(text="Connecting...", text_color=COLOR_WARNING); self.update()
-        try:
-            conn = psycopg2.connect(url)
-            with conn:
-                with conn.cursor() as cur:
-                    cur.execute("CREATE TABLE IF NOT EXISTS settings (key VARCHAR(50) PRIMARY KEY, value FLOAT)")
-                    cur.execute("CREATE TABLE IF NOT EXISTS transactions (id VARCHAR(255) PRIMARY KEY, t_date VARCHAR(50), t_type VARCHAR(50), payload JSONB)")
-                    cur.execute("INSERT INTO settings (key, value) VALUES ('display_rate', %s) ON CONFLICT DO NOTHING", (DEFAULT_USD_RATE,))
-                    cur.execute("INSERT INTO settings (key, value) VALUES ('display_rate_eur', %s) ON CONFLICT DO NOTHING", (DEFAULT_EUR_RATE,))
-            conn.close()
+        self.lbl_setup_error.configure(text="Connecting...", text_color=COLOR_WARNING)
+        def connected():
             self.db_url = url
-            with open(self.config_file, "w") as f: json.dump({"db_url": self.db_url}, f)
+            try:
+                with open(self.config_file, "w") as f: json.dump({"db_url": self.db_url}, f)
+            except OSError as e: self.show_error_native(f"Could not save config:\n{e}")
             self.start_full_app()
-        except Exception as e:
-            self.lbl_setup_error.configure(text=f"Failed: {e}", text_color=COLOR_DANGER)
+        self._attempt_connect(url, connected, lambda e: self.lbl_setup_error.configure(text=f"Failed: {e}", text_color=COLOR_DANGER))
 
     def start_full_app(self):
         try:
             for w in self.winfo_children(): w.destroy()
+            self._last_labels = {}
             self.grid_columnconfigure(0, weight=0); self.grid_columnconfigure(1, weight=1)
             self.current_date = datetime.now()
             self.selected_month = self.current_date.month
             self.selected_year = self.current_date.year
-            self.data = self.fetch_data_from_db()
             self.sidebar_frame = ctk.CTkFrame(self, width=260, corner_radius=0, fg_color=COLOR_SIDEBAR)
             self.sidebar_frame.grid(row=0, column=0, sticky="nsew"); self.sidebar_frame.grid_rowconfigure(8, weight=1)
             self.create_sidebar()
@@ -169,6 +427,7 @@ class FinancialTrackerApp(ctk.CTk):
             self.main_frame.grid_columnconfigure(0, weight=1); self.main_frame.grid_rowconfigure(0, weight=1)
             self.create_dashboard_frame(); self.create_income_frame(); self.create_transfer_frame()
             self.create_expenses_frame(); self.create_savings_frame(); self.create_lending_frame()
+            self._dirty = set(self.frames)
             self.show_frame("dashboard")
         except Exception as e:
             messagebox.showerror("Fatal", f"{e}\n\n{traceback.format_exc()}")
@@ -177,65 +436,97 @@ class FinancialTrackerApp(ctk.CTk):
     # DB OPS
     # ================================================================
     def fetch_data_from_db(self):
-        data = {"settings": {"display_rate": DEFAULT_USD_RATE, "display_rate_eur": DEFAULT_EUR_RATE}, "transactions": []}
-        try:
-            conn = self.get_db_connection()
-            with conn.cursor() as cur:
-                cur.execute("INSERT INTO settings (key, value) VALUES ('display_rate_eur', %s) ON CONFLICT DO NOTHING", (DEFAULT_EUR_RATE,))
-                conn.commit()
-                cur.execute("SELECT key, value FROM settings WHERE key IN ('display_rate', 'display_rate_eur')")
-                for row in cur.fetchall():
-                    data["settings"][row[0]] = row[1]
-                cur.execute("SELECT payload FROM transactions ORDER BY t_date ASC")
-                data["transactions"] = [r[0] for r in cur.fetchall()]
-            conn.commit()
-        except Exception as e:
-            self.show_error_native(f"Fetch failed:\n{e}")
-        self._cached_stats = None
+        # Runs on the DB worker thread.
+        data = {"settings": {"display_rate": DEFAULT_USD_RATE, "display_rate_eur": DEFAULT_EUR_RATE}, "transactions": [], "stat_groups": [], "version": None}
+        with self.pool.connection() as conn:
+            # Queue all four reads and pay a single round-trip for them.
+            with conn.pipeline():
+                # One snapshot for all reads, so the version matches the rows it is reported with.
+                conn.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                c_ver = conn.execute("SELECT v FROM meta WHERE k = 'tx_version'")
+                c_set = conn.execute("SELECT key, value FROM settings WHERE key IN ('display_rate', 'display_rate_eur')")
+                c_stats = conn.execute(STATS_SQL)
+                c_tx = conn.execute("SELECT payload FROM transactions ORDER BY t_date ASC")
+            row = c_ver.fetchone(); data["version"] = row[0] if row else None
+            for row in c_set.fetchall():
+                data["settings"][row[0]] = row[1]
+            data["stat_groups"] = [{"date": r[0] or "", "type": r[1], "currency": r[2], "to_paypal": r[3], "status": r[4], **dict(zip(STATS_SUM_KEYS, r[5:]))} for r in c_stats.fetchall()]
+            data["transactions"] = [r[0] for r in c_tx.fetchall()]
         return data
 
-    def add_transaction_to_db(self, t):
-        try:
-            conn = self.get_db_connection()
-            with conn.cursor() as cur:
-                cur.execute("INSERT INTO transactions (id, t_date, t_type, payload) VALUES (%s, %s, %s, %s)", (t['id'], t['date'], t['type'], Json(t)))
-            conn.commit(); self.data["transactions"].append(t); self._cached_stats = None; self.refresh_ui(); return True
-        except psycopg2.IntegrityError:
-            self.get_db_connection().rollback(); self.show_error_native("Duplicate."); return False
-        except Exception as e:
-            try: self.get_db_connection().rollback()
-            except: pass
-            self.show_error_native(f"Save failed:\n{e}"); return False
-
-    def update_transaction_in_db(self, t):
-        try:
-            conn = self.get_db_connection()
-            with conn.cursor() as cur:
-                cur.execute("UPDATE transactions SET payload = %s WHERE id = %s", (Json(t), t['id']))
-            conn.commit()
-            for i, ex in enumerate(self.data["transactions"]):
-                if ex.get("id") == t["id"]: self.data["transactions"][i] = t; break
-            self._cached_stats = None; self.refresh_ui(); return True
-        except Exception as e:
-            try: self.get_db_connection().rollback()
-            except: pass
-            self.show_error_native(f"Update failed:\n{e}"); return False
+    def load_data(self):
+        self._submit(self.fetch_data_from_db, self._apply_data, lambda e: self.show_error_native(f"Fetch failed:\n{e}"))
+
+    def _apply_data(self, data):
+        # Loads and writes share a multi-thread pool; a load that read before one of our writes committed is
+        # stale. Fetch again rather than drop it, or whatever it was loading (the first load, a remote change) is lost.
+        if data["version"] is not None and data["version"] < self._write_floor: self.load_data(); return
+        old_settings = self.data["settings"]
+        self.data = {"settings": data["settings"]}; self._tx_version = data["version"]
+        self.totals = dict(ZERO_TOTALS); self.monthly_totals = {}; self.by_month = {}
+        for g in data["stat_groups"]: self._apply_delta(g, 1)
+        # Rows arrive ordered by date, so dict insertion order doubles as the date index.
+        self.tx_by_id = {t['id']: _normalize(t) for t in data["transactions"]}
+        for tid, t in self.tx_by_id.items(): self.by_month.setdefault(_month_key(str(t.get('date', ''))), {})[tid] = t
+        if hasattr(self, "entry_rate_usd"):
+            for e, k in ((self.entry_rate_usd, "display_rate"), (self.entry_rate_eur, "display_rate_eur")):
+                if old_settings.get(k) != data["settings"].get(k): e.delete(0, 'end'); e.insert(0, str(data["settings"].get(k)))
+        self.schedule_refresh()
+
+    def add_transaction_to_db(self, t, on_ok=None):
+        # Until the insert lands the totals don't include it, so a repeat click would double-save and slip past _check_bal.
+        if self._saving: return
+        self._saving = True
+        def work():
+            with self.db_cursor() as cur:
+                cur.execute(INSERT_TX_SQL, _tx_row(t))
+                return self._bump_version(cur)
+        def done(v):
+            self._saving = False
+            if self._saw_own_write(v): self._track(t)
+            self.schedule_refresh()
+            if on_ok: on_ok()
+        def failed(e):
+            self._saving = False
+            self.show_error_native("Duplicate." if isinstance(e, psycopg.IntegrityError) else f"Save failed:\n{e}")
+        self._submit(work, done, failed)
+
+    def import_transactions(self, ts, on_ok=None):
+        """Bulk-insert ts in one transaction. on_ok(inserted, skipped) runs once it commits, with the reload queued;
+        rows missing id/date/type or whose id already exists count as skipped."""
+        rows = [_tx_row(t) for t in ts if t.get('id') and t.get('date') and t.get('type')]
+        def work():
+            with self.db_cursor() as cur:
+                if len(rows) >= COPY_IMPORT_MIN:
+                    cur.execute("CREATE TEMP TABLE tx_import (id VARCHAR(255), t_date VARCHAR(50), t_type VARCHAR(50), payload JSONB) ON COMMIT DROP")
+                    with cur.copy("COPY tx_import (id, t_date, t_type, payload) FROM STDIN") as cp:
+                        for r in rows: cp.write_row(r)
+                    cur.execute("INSERT INTO transactions (id, t_date, t_type, payload) SELECT DISTINCT ON (id) id, t_date, t_type, payload FROM tx_import ON CONFLICT (id) DO NOTHING")
+                    n = cur.rowcount
+                else:
+                    cur.executemany(INSERT_TX_SQL + " ON CONFLICT (id) DO NOTHING", rows)
+                    n = cur.rowcount  # psycopg sums rowcount over an executemany batch
+                return n, (self._bump_version(cur) if n else None)
+        def done(res):
+            n, v = res
+            if n: self._saw_own_write(v); self.load_data()
+            if on_ok: on_ok(n, len(ts) - n)
+        self._submit(work, done, lambda e: self.show_error_native(f"Import failed:\n{e}"))
 
     def delete_transaction(self, tid):
         d = ctk.CTkToplevel(self); d.title("Confirm"); d.geometry("340x170"); d.configure(fg_color=COLOR_CARD); d.attributes('-topmost', True)
         ctk.CTkLabel(d, text="Delete this transaction?", font=FONT_BOLD, text_color=COLOR_TEXT_MAIN).pack(pady=(25, 5))
         ctk.CTkLabel(d, text="This cannot be undone.", font=FONT_SMALL, text_color=COLOR_TEXT_SUB).pack(pady=(0, 15))
+        def work():
+            with self.db_cursor() as cur:
+                cur.execute("DELETE FROM transactions WHERE id = %s", (tid,)); return self._bump_version(cur)
+        def done(v):
+            self._saw_own_write(v)
+            old = self.tx_by_id.get(tid)
+            if old is not None: self._untrack(old)
+            self.schedule_refresh()
         def confirm():
-            d.destroy()
-            try:
-                conn = self.get_db_connection()
-                with conn.cursor() as cur: cur.execute("DELETE FROM transactions WHERE id = %s", (tid,))
-                conn.commit(); self.data["transactions"] = [t for t in self.data["transactions"] if t.get("id","") != tid]
-                self._cached_stats = None; self.refresh_ui()
-            except Exception as e:
-                try: self.get_db_connection().rollback()
-                except: pass
-                self.show_error_native(f"Delete failed:\n{e}")
+            d.destroy(); self._submit(work, done, lambda e: self.show_error_native(f"Delete failed:\n{e}"))
         bf = ctk.CTkFrame(d, fg_color="transparent"); bf.pack(pady=10)
         ctk.CTkButton(bf, text="Cancel", width=110, height=38, corner_radius=12, fg_color=COLOR_INPUT, hover_color=COLOR_HOVER, command=d.destroy).pack(side="left", padx=8)
         ctk.CTkButton(bf, text="Delete", width=110, height=38, corner_radius=12, fg_color=COLOR_DANGER, hover_color=COLOR_DANGER_DIM, command=confirm).pack(side="right", padx=8)
@@ -246,15 +537,13 @@ class FinancialTrackerApp(ctk.CTk):
             if val <= 0: raise ValueError
         except ValueError:
             self.show_error_native("Enter a valid positive rate."); return
-        try:
-            conn = self.get_db_connection()
-            with conn.cursor() as cur: cur.execute("UPDATE settings SET value = %s WHERE key = %s", (val, key))
-            conn.commit(); self.data["settings"][key] = val; self._cached_stats = None; self.refresh_ui()
+        def work():
+            with self.db_cursor() as cur:
+                cur.execute("UPDATE settings SET value = %s WHERE key = %s", (val, key)); return self._bump_version(cur)
+        def done(v):
+            self._saw_own_write(v); self.data["settings"][key] = val; self.schedule_refresh()
             self.show_success_native("Rate updated.")
-        except Exception as e:
-            try: self.get_db_connection().rollback()
-            except: pass
-            self.show_error_native(f"Update failed:\n{e}")
+        self._submit(work, done, lambda e: self.show_error_native(f"Update failed:\n{e}"))
 
     def show_error_native(self, msg):
         d = ctk.CTkToplevel(self); d.title("Error"); d.geometry("440x180"); d.configure(fg_color=COLOR_CARD); d.attributes('-topmost', True)
@@ -310,11 +599,19 @@ class FinancialTrackerApp(ctk.CTk):
         self.frames[name].grid(row=0, column=0, sticky="nsew")
         for bn, btn in self.nav_buttons.items():
             btn.configure(fg_color=COLOR_PRIMARY if bn == name else "transparent", text_color="white" if bn == name else COLOR_TEXT_SUB)
+        self._current_frame = name
         if name == "dashboard":
             now = datetime.now(); self.selected_month = now.month; self.selected_year = now.year
-        self.data = self.fetch_data_from_db(); self.refresh_ui()
+            self.schedule_refresh()
+        elif name in self._dirty: self._update_list(name)
+        # Nothing loaded yet means the version check can only say "reload", so skip its round-trip.
+        if self._tx_version is None: self.load_data()
+        else: self._submit(self.remote_version, self._on_remote_version, lambda e: self.load_data())
+
+    def _on_remote_version(self, v):
+        if v is None or v != self._tx_version: self.load_data()
 
-    def get_monthly_key(self): return f"{self.selected_year}-{self.selected_month:02d}"
+    def get_monthly_key(self): return self.selected_year * 12 + self.selected_month
 
     def get_rates(self):
         def sr(k, d):
@@ -348,56 +645,41 @@ class FinancialTrackerApp(ctk.CTk):
     # STATS
     # ================================================================
     def calculate_stats(self):
-        if self._cached_stats and self._cached_stats.get("_mk") == self.get_monthly_key():
-            return self._cached_stats
-        tm = self.get_monthly_key()
-        s = {
-            "usd": 0.0, "eur": 0.0, "dzd": 0.0, "paypal": 0.0,
-            "usd_locked": 0.0, "eur_locked": 0.0, "dzd_locked": 0.0,
-            "m_earn_usd": 0.0, "m_earn_eur": 0.0, "m_earn_dzd": 0.0,
-            "m_spend_usd": 0.0, "m_spend_eur": 0.0, "m_spend_dzd": 0.0,
-            "lent_usd": 0.0, "lent_eur": 0.0, "lent_dzd": 0.0,
-        }
-        for t in self.data.get("transactions", []):
-            c = t.get('currency', 'USD'); tt = t.get('type', ''); td = str(t.get('date', ''))
-            def sf(k):
-                try: return float(t.get(k, 0))
-                except: return 0.0
-            base = sf('amount'); net = sf('net_amount')
-            if net == 0: net = base
-
-            bal_key = {"USD": "usd", "EUR": "eur", "DZD": "dzd"}.get(c, "usd")
-            lock_key = bal_key + "_locked"
-
-            if tt == 'income':
-                if t.get('to_paypal') and c == 'USD': s['paypal'] += net
-                else: s[bal_key] += net
-            elif tt == 'expense':
-                s[bal_key] -= base
-            elif tt == 'transfer_usd_dzd':
-                s['usd'] -= sf('amount_usd'); s['dzd'] += sf('amount_dzd')
-            elif tt == 'transfer_eur_dzd':
-                s['eur'] -= sf('amount_eur'); s['dzd'] += sf('amount_dzd')
-            elif tt == 'transfer_dzd_eur':
-                s['dzd'] -= sf('amount_dzd'); s['eur'] += sf('amount_eur')
-            elif tt == 'transfer_paypal_bank':
-                s['paypal'] -= sf('amount_sent'); s['usd'] += sf('amount_received')
-            elif tt == 'savings_deposit':
-                s[bal_key] -= base; s[lock_key] += base
-            elif tt == 'savings_withdraw':
-                s[bal_key] += base; s[lock_key] -= base
-            elif tt == 'loan_out':
-                s[bal_key] -= base
-                if t.get('status', 'active') == 'active':
-                    s["lent_" + bal_key] += base
-            elif tt == 'loan_repaid':
-                s[bal_key] += base
-
-            if td.startswith(tm):
-                if tt == 'income': s["m_earn_" + bal_key] += net
-                elif tt == 'expense': s["m_spend_" + bal_key] += base
-
-        s["_mk"] = tm; self._cached_stats = s; return s
+        m = self.monthly_totals.get(self.get_monthly_key(), ZERO_MONTH)
+        return {**self.totals, **m}
+
+    def _track(self, t):
+        self._apply_delta(t, 1); self.tx_by_id[t['id']] = t
+        self.by_month.setdefault(_month_key(str(t.get('date', ''))), {})[t['id']] = t
+
+    def _untrack(self, t):
+        self._apply_delta(t, -1); self.tx_by_id.pop(t['id'], None)
+        self.by_month.get(_month_key(str(t.get('date', ''))), {}).pop(t['id'], None)
+
+    def _retrack(self, old, new):
+        # Re-assigning an existing key keeps its place, so date order is preserved.
+        self._apply_delta(old, -1); self._apply_delta(new, 1); self.tx_by_id[new['id']] = new
+        bucket = self.by_month.get(_month_key(str(old.get('date', ''))), {})
+        if new['id'] in bucket: bucket[new['id']] = new
+
+    def month_rows(self):
+        """Transactions dated in the selected month, oldest first."""
+        return self.by_month.get(self.get_monthly_key(), {}).values()
+
+    def _apply_delta(self, t, sign):
+        """Fold one transaction into self.totals / self.monthly_totals (sign=-1 to remove it)."""
+        tt = t.get('type', ''); bk = self._bal_key(t.get('currency', 'USD'))
+        base = _sf(t, 'amount'); net = _sf(t, 'net_amount')
+        if net == 0: net = base
+        fx = TX_EFFECTS.get(tt)
+        if fx:
+            for k, v in fx(t, bk, base, net): self.totals[k] += sign * v
+        if tt in ('income', 'expense'):
+            mk = _month_key(str(t.get('date', '')))
+            m = self.monthly_totals.get(mk)
+            if m is None: m = self.monthly_totals[mk] = dict(ZERO_MONTH)
+            if tt == 'income': m["m_earn_" + bk] += sign * net
+            else: m["m_spend_" + bk] += sign * base
 
     # ================================================================
     # CARD BUILDERS
@@ -473,52 +755,58 @@ class FinancialTrackerApp(ctk.CTk):
         self.d_sort = ctk.CTkOptionMenu(fr, values=["Newest First","Oldest First","Highest","Lowest"], fg_color=COLOR_INPUT, button_color=COLOR_INPUT, button_hover_color=COLOR_HOVER, corner_radius=10, height=32, font=FONT_TINY, command=lambda _: self.update_dashboard_history()); self.d_sort.pack(side="right", padx=(8,0))
         self.d_type = ctk.CTkOptionMenu(fr, values=["All","Income","Expense","Transfer","Savings","Loan"], fg_color=COLOR_INPUT, button_color=COLOR_INPUT, button_hover_color=COLOR_HOVER, corner_radius=10, height=32, font=FONT_TINY, command=lambda _: self.update_dashboard_history()); self.d_type.pack(side="right")
 
-        self.dash_list = ctk.CTkScrollableFrame(frame, fg_color="transparent", scrollbar_button_color=COLOR_BORDER)
+        self.dash_list = self.history_list(frame, simple=True)
         self.dash_list.grid(row=4, column=0, sticky="nsew", padx=30, pady=(0, 20))
 
     def update_dashboard_history(self):
-        for w in self.dash_list.winfo_children(): w.destroy()
-        tm = self.get_monthly_key(); ft = self.d_type.get(); fs = self.d_sort.get()
+        ft = self.d_type.get(); fs = self.d_sort.get()
         fl = []
-        for t in self.data["transactions"]:
-            td = str(t.get('date','')); tv = str(t.get('type',''))
-            if not td.startswith(tm): continue
+        # month_rows() is already date-ordered, so only the amount sorts need a real sort.
+        for t in (reversed(self.month_rows()) if "Newest" in fs else self.month_rows()):
+            tv = str(t.get('type',''))
             ok = (ft=="All" or (ft=="Income" and tv=='income') or (ft=="Expense" and tv=='expense') or (ft=="Transfer" and 'transfer' in tv) or (ft=="Savings" and 'savings' in tv) or (ft=="Loan" and tv in ('loan_out','loan_repaid')))
             if ok: fl.append(t)
         def sa(x):
             try: return float(x.get('amount', x.get('amount_usd', x.get('amount_sent',0))))
             except: return 0
-        if "Newest" in fs: fl.sort(key=lambda x: str(x.get('date','')), reverse=True)
-        elif "Oldest" in fs: fl.sort(key=lambda x: str(x.get('date','')))
-        elif "Highest" in fs: fl.sort(key=sa, reverse=True)
+        if "Highest" in fs: fl.sort(key=sa, reverse=True)
         elif "Lowest" in fs: fl.sort(key=sa)
-        if not fl: ctk.CTkLabel(self.dash_list, text="No transactions this month.", font=FONT_MAIN, text_color=COLOR_TEXT_DIM).pack(pady=40)
-        else:
-            for t in fl: self.create_list_row(self.dash_list, t, simple=True)
+        self.dash_list.set_items(fl, "No transactions this month.", empty_pady=40)
 
     # ================================================================
     # REFRESH
     # ================================================================
+    def _set(self, w, text):
+        """configure(text=...) only when the text changed; re-configuring a CTkLabel triggers a relayout."""
+        if self._last_labels.get(w) != text: w.configure(text=text); self._last_labels[w] = text
+
+    def schedule_refresh(self):
+        """Coalesce refresh requests: however many arrive before Tk goes idle, refresh_ui runs once."""
+        if self._refresh_pending is None: self._refresh_pending = self.after_idle(self._run_refresh)
+
+    def _run_refresh(self):
+        self._refresh_pending = None; self.refresh_ui()
+
     def refresh_ui(self):
         try:
             st = self.calculate_stats(); ur, er = self.get_rates()
 
-            self.lbl_pp.configure(text=f"${st['paypal']:,.2f}"); self.lbl_pp_s.configure(text=f"≈ {st['paypal']*ur:,.0f} DZD")
-            self.lbl_usd.configure(text=f"${st['usd']:,.2f}"); self.lbl_usd_s.configure(text=f"≈ {st['usd']*ur:,.0f} DZD")
-            self.lbl_eur.configure(text=f"€{st['eur']:,.2f}"); self.lbl_eur_s.configure(text=f"≈ {st['eur']*er:,.0f} DZD")
-            self.lbl_dzd.configure(text=f"{st['dzd']:,.2f} DZD"); self.lbl_dzd_s.configure(text=f"≈ ${st['dzd']/ur:,.2f}")
+            self._set(self.lbl_pp, f"${st['paypal']:,.2f}"); self._set(self.lbl_pp_s, f"≈ {st['paypal']*ur:,.0f} DZD")
+            self._set(self.lbl_usd, f"${st['usd']:,.2f}"); self._set(self.lbl_usd_s, f"≈ {st['usd']*ur:,.0f} DZD")
+            self._set(self.lbl_eur, f"€{st['eur']:,.2f}"); self._set(self.lbl_eur_s, f"≈ {st['eur']*er:,.0f} DZD")
+            self._set(self.lbl_dzd, f"{st['dzd']:,.2f} DZD"); self._set(self.lbl_dzd_s, f"≈ ${st['dzd']/ur:,.2f}")
 
             # Income triple
             for i, (k, sym, r) in enumerate([("usd","$",ur),("eur","€",er),("dzd","",1)]):
                 val = st[f"m_earn_{k}"]
-                if k == "dzd": self.inc_cols[i][0].configure(text=f"+ {val:,.0f} DZD"); self.inc_cols[i][1].configure(text=f"≈ ${val/ur:,.2f}")
-                else: self.inc_cols[i][0].configure(text=f"+ {sym}{val:,.2f}"); self.inc_cols[i][1].configure(text=f"≈ {val*r:,.0f} DZD")
+                if k == "dzd": self._set(self.inc_cols[i][0], f"+ {val:,.0f} DZD"); self._set(self.inc_cols[i][1], f"≈ ${val/ur:,.2f}")
+                else: self._set(self.inc_cols[i][0], f"+ {sym}{val:,.2f}"); self._set(self.inc_cols[i][1], f"≈ {val*r:,.0f} DZD")
 
             # Expense triple
             for i, (k, sym, r) in enumerate([("usd","$",ur),("eur","€",er),("dzd","",1)]):
                 val = st[f"m_spend_{k}"]
-                if k == "dzd": self.exp_cols[i][0].configure(text=f"{val:,.0f} DZD"); self.exp_cols[i][1].configure(text=f"≈ ${val/ur:,.2f}")
-                else: self.exp_cols[i][0].configure(text=f"{sym}{val:,.2f}"); self.exp_cols[i][1].configure(text=f"≈ {val*r:,.0f} DZD")
+                if k == "dzd": self._set(self.exp_cols[i][0], f"{val:,.0f} DZD"); self._set(self.exp_cols[i][1], f"≈ ${val/ur:,.2f}")
+                else: self._set(self.exp_cols[i][0], f"{sym}{val:,.2f}"); self._set(self.exp_cols[i][1], f"≈ {val*r:,.0f} DZD")
 
             # Net worth
             t_usd = st['usd'] + st['paypal'] + st['usd_locked']
@@ -526,24 +814,25 @@ class FinancialTrackerApp(ctk.CTk):
             t_dzd = st['dzd'] + st['dzd_locked']
             nw_dzd = t_dzd + (t_usd * ur) + (t_eur * er)
             nw_usd = t_usd + t_eur * (er / ur) + (t_dzd / ur)
-            self.lbl_nw.configure(text=f"${nw_usd:,.2f}"); self.lbl_nw_sub.configure(text=f"≈ {nw_dzd:,.0f} DZD")
-            self.lbl_month.configure(text=datetime(self.selected_year, self.selected_month, 1).strftime('%B'))
-            self.lbl_year.configure(text=str(self.selected_year))
+            self._set(self.lbl_nw, f"${nw_usd:,.2f}"); self._set(self.lbl_nw_sub, f"≈ {nw_dzd:,.0f} DZD")
+            self._set(self.lbl_month, datetime(self.selected_year, self.selected_month, 1).strftime('%B'))
+            self._set(self.lbl_year, str(self.selected_year))
 
             # Savings vault
             if "savings" in self.frames:
-                self.lbl_v_usd.configure(text=f"${st['usd_locked']:,.2f}"); self.lbl_v_usd_s.configure(text=f"≈ {st['usd_locked']*ur:,.0f} DZD")
-                self.lbl_v_eur.configure(text=f"€{st['eur_locked']:,.2f}"); self.lbl_v_eur_s.configure(text=f"≈ {st['eur_locked']*er:,.0f} DZD")
-                self.lbl_v_dzd.configure(text=f"{st['dzd_locked']:,.2f} DZD"); self.lbl_v_dzd_s.configure(text=f"≈ ${st['dzd_locked']/ur:,.2f}")
+                self._set(self.lbl_v_usd, f"${st['usd_locked']:,.2f}"); self._set(self.lbl_v_usd_s, f"≈ {st['usd_locked']*ur:,.0f} DZD")
+                self._set(self.lbl_v_eur, f"€{st['eur_locked']:,.2f}"); self._set(self.lbl_v_eur_s, f"≈ {st['eur_locked']*er:,.0f} DZD")
+                self._set(self.lbl_v_dzd, f"{st['dzd_locked']:,.2f} DZD"); self._set(self.lbl_v_dzd_s, f"≈ ${st['dzd_locked']/ur:,.2f}")
 
             # Lending
             if "lending" in self.frames:
-                self.lbl_lo_usd.configure(text=f"${st['lent_usd']:,.2f}"); self.lbl_lo_usd_s.configure(text=f"≈ {st['lent_usd']*ur:,.0f} DZD")
-                self.lbl_lo_eur.configure(text=f"€{st['lent_eur']:,.2f}"); self.lbl_lo_eur_s.configure(text=f"≈ {st['lent_eur']*er:,.0f} DZD")
-                self.lbl_lo_dzd.configure(text=f"{st['lent_dzd']:,.2f} DZD"); self.lbl_lo_dzd_s.configure(text=f"≈ ${st['lent_dzd']/ur:,.2f}")
+                self._set(self.lbl_lo_usd, f"${st['lent_usd']:,.2f}"); self._set(self.lbl_lo_usd_s, f"≈ {st['lent_usd']*ur:,.0f} DZD")
+                self._set(self.lbl_lo_eur, f"€{st['lent_eur']:,.2f}"); self._set(self.lbl_lo_eur_s, f"≈ {st['lent_eur']*er:,.0f} DZD")
+                self._set(self.lbl_lo_dzd, f"{st['lent_dzd']:,.2f} DZD"); self._set(self.lbl_lo_dzd_s, f"≈ ${st['lent_dzd']/ur:,.2f}")
 
-            self.update_income_list(); self.update_expense_list(); self.update_transfer_list()
-            self.update_savings_list(); self.update_dashboard_history(); self.update_lending_list()
+            # Only the visible frame's list is rebuilt; the rest catch up in show_frame.
+            self._dirty.update(self.frames)
+            if self._current_frame in self.frames: self._update_list(self._current_frame)
         except Exception as e:
             messagebox.showerror("Refresh Error", f"{e}\n\n{traceback.format_exc()}")
 
@@ -556,7 +845,7 @@ class FinancialTrackerApp(ctk.CTk):
                 if self.selected_month == 1: self.selected_month = 12; self.selected_year -= 1
                 else: self.selected_month -= 1
         else: self.selected_year += d
-        self._cached_stats = None; self.refresh_ui()
+        self.schedule_refresh()
 
     # ================================================================
     # FORM HELPERS
@@ -603,7 +892,7 @@ class FinancialTrackerApp(ctk.CTk):
         self.chk_pp.grid(row=3, column=0, columnspan=2, pady=12, sticky="w")
         self.btn(form, "Add Income", COLOR_SUCCESS, COLOR_SUCCESS_DIM, self.add_income).grid(row=4, column=0, columnspan=2, pady=(8,0), sticky="ew")
         ctk.CTkLabel(f, text="History", font=FONT_SUBHEADER, text_color=COLOR_TEXT_MAIN).grid(row=2, column=0, sticky="w", padx=30, pady=(20,8))
-        self.income_list = ctk.CTkScrollableFrame(f, fg_color="transparent", scrollbar_button_color=COLOR_BORDER); self.income_list.grid(row=3, column=0, sticky="nsew", padx=30, pady=(0,20))
+        self.income_list = self.history_list(f); self.income_list.grid(row=3, column=0, sticky="nsew", padx=30, pady=(0,20))
 
     # ================================================================
     # TRANSFERS
@@ -644,7 +933,7 @@ class FinancialTrackerApp(ctk.CTk):
         self.btn(c4, "Buy EUR", COLOR_EUR, COLOR_EUR_DIM, self.transfer_dzd_eur).pack(fill="x", pady=(12,6))
 
         ctk.CTkLabel(f, text="Transfer History", font=FONT_SUBHEADER, text_color=COLOR_TEXT_MAIN).pack(anchor="w", padx=30, pady=(20,8))
-        self.transfer_list = ctk.CTkScrollableFrame(f, fg_color="transparent", scrollbar_button_color=COLOR_BORDER); self.transfer_list.pack(fill="both", expand=True, padx=30, pady=(0,20))
+        self.transfer_list = self.history_list(f); self.transfer_list.pack(fill="both", expand=True, padx=30, pady=(0,20))
 
     # ================================================================
     # EXPENSES
@@ -658,7 +947,7 @@ class FinancialTrackerApp(ctk.CTk):
         self.combo_exp_curr = self.combo(form, ["DZD (Cash)","USD (Online)","EUR (Online)"]); self.combo_exp_curr.grid(row=1, column=1, padx=(6,0), pady=6, sticky="ew")
         self.btn(form, "Record Expense", COLOR_DANGER, COLOR_DANGER_DIM, self.add_expense).grid(row=2, column=0, columnspan=2, pady=(12,0), sticky="ew")
         ctk.CTkLabel(f, text="Recent", font=FONT_SUBHEADER, text_color=COLOR_TEXT_MAIN).grid(row=2, column=0, sticky="w", padx=30, pady=(20,8))
-        self.expense_list = ctk.CTkScrollableFrame(f, fg_color="transparent", scrollbar_button_color=COLOR_BORDER); self.expense_list.grid(row=3, column=0, sticky="nsew", padx=30, pady=(0,20))
+        self.expense_list = self.history_list(f); self.expense_list.grid(row=3, column=0, sticky="nsew", padx=30, pady=(0,20))
 
     # ================================================================
     # SAVINGS
@@ -683,7 +972,7 @@ class FinancialTrackerApp(ctk.CTk):
         self.btn(form, "Confirm", COLOR_SAVINGS, COLOR_SAVINGS_DIM, self.manage_savings).grid(row=2, column=0, columnspan=2, pady=(8,0), sticky="ew")
 
         ctk.CTkLabel(f, text="History", font=FONT_SUBHEADER, text_color=COLOR_TEXT_MAIN).grid(row=3, column=0, columnspan=3, sticky="w", padx=30, pady=(20,8))
-        self.savings_list = ctk.CTkScrollableFrame(f, fg_color="transparent", scrollbar_button_color=COLOR_BORDER); self.savings_list.grid(row=4, column=0, columnspan=3, sticky="nsew", padx=30, pady=(0,20))
+        self.savings_list = self.history_list(f); self.savings_list.grid(row=4, column=0, columnspan=3, sticky="nsew", padx=30, pady=(0,20))
 
     # ================================================================
     # LENDING
@@ -734,7 +1023,7 @@ class FinancialTrackerApp(ctk.CTk):
         return {"USD":"$","EUR":"€","DZD":""}.get(curr,"")
 
     def _check_bal(self, curr, amt, stat_key=None):
-        self._cached_stats = None; s = self.calculate_stats()
+        s = self.calculate_stats()
         k = stat_key or self._bal_key(curr); bal = s[k]
         if bal < amt:
             sym = self._sym(curr)
@@ -764,10 +1053,11 @@ class FinancialTrackerApp(ctk.CTk):
             to_pp = self.chk_pp_var.get() == "on" and curr == "USD"
         if fee > val: self.show_error_native("Fee exceeds income."); return
         t = {"id":str(uuid.uuid4()),"date":datetime.now().strftime("%Y-%m-%d %H:%M:%S"),"type":"income","category":name,"amount":val,"currency":curr,"fee_type":fee_type,"fee_amount":fee,"net_amount":val-fee,"to_paypal":to_pp}
-        if self.add_transaction_to_db(t):
+        def done():
             self.e_inc_name.delete(0,'end'); self.e_inc_amt.delete(0,'end')
             self.entry_fee.configure(state="normal"); self.entry_fee.delete(0,'end'); self.entry_fee.configure(state="disabled")
             self.show_success_native("Income added.")
+        self.add_transaction_to_db(t, done)
 
     def transfer_pp(self):
         try:
@@ -778,7 +1068,8 @@ class FinancialTrackerApp(ctk.CTk):
         if not self._check_bal("USD", amt, "paypal"): return
         if amt - fee <= 0: self.show_error_native("Amount after fee is zero."); return
         t = {"id":str(uuid.uuid4()),"date":datetime.now().strftime("%Y-%m-%d %H:%M:%S"),"type":"transfer_paypal_bank","amount_sent":amt,"fee_paid":fee,"amount_received":amt-fee}
-        if self.add_transaction_to_db(t): self.e_pp.delete(0,'end'); self.show_success_native("Transfer complete.")
+        def done(): self.e_pp.delete(0,'end'); self.show_success_native("Transfer complete.")
+        self.add_transaction_to_db(t, done)
 
     def transfer_usd_dzd(self):
         try:
@@ -787,7 +1078,8 @@ class FinancialTrackerApp(ctk.CTk):
         except ValueError: self.show_error_native("Enter valid numbers."); return
         if not self._check_bal("USD", usd): return
         t = {"id":str(uuid.uuid4()),"date":datetime.now().strftime("%Y-%m-%d %H:%M:%S"),"type":"transfer_usd_dzd","amount_usd":usd,"rate":rate,"amount_dzd":usd*rate}
-        if self.add_transaction_to_db(t): self.e_ex_usd.delete(0,'end'); self.e_ex_usd_rate.delete(0,'end'); self.show_success_native("Exchange complete.")
+        def done(): self.e_ex_usd.delete(0,'end'); self.e_ex_usd_rate.delete(0,'end'); self.show_success_native("Exchange complete.")
+        self.add_transaction_to_db(t, done)
 
     def transfer_eur_dzd(self):
         try:
@@ -796,7 +1088,8 @@ class FinancialTrackerApp(ctk.CTk):
         except ValueError: self.show_error_native("Enter valid numbers."); return
         if not self._check_bal("EUR", eur): return
         t = {"id":str(uuid.uuid4()),"date":datetime.now().strftime("%Y-%m-%d %H:%M:%S"),"type":"transfer_eur_dzd","amount_eur":eur,"rate":rate,"amount_dzd":eur*rate}
-        if self.add_transaction_to_db(t): self.e_ex_eur.delete(0,'end'); self.e_ex_eur_rate.delete(0,'end'); self.show_success_native("Exchange complete.")
+        def done(): self.e_ex_eur.delete(0,'end'); self.e_ex_eur_rate.delete(0,'end'); self.show_success_native("Exchange complete.")
+        self.add_transaction_to_db(t, done)
 
     def transfer_dzd_eur(self):
         try:
@@ -806,7 +1099,8 @@ class FinancialTrackerApp(ctk.CTk):
         if not self._check_bal("DZD", dzd): return
         eur_received = dzd / rate
         t = {"id":str(uuid.uuid4()),"date":datetime.now().strftime("%Y-%m-%d %H:%M:%S"),"type":"transfer_dzd_eur","amount_dzd":dzd,"rate":rate,"amount_eur":eur_received}
-        if self.add_transaction_to_db(t): self.e_buy_eur_dzd.delete(0,'end'); self.e_buy_eur_rate.delete(0,'end'); self.show_success_native("EUR purchased.")
+        def done(): self.e_buy_eur_dzd.delete(0,'end'); self.e_buy_eur_rate.delete(0,'end'); self.show_success_native("EUR purchased.")
+        self.add_transaction_to_db(t, done)
 
     def add_expense(self):
         desc = self.e_exp_desc.get().strip()
@@ -818,7 +1112,8 @@ class FinancialTrackerApp(ctk.CTk):
         curr = self._parse_curr(self.combo_exp_curr.get())
         if not self._check_bal(curr, amt): return
         t = {"id":str(uuid.uuid4()),"date":datetime.now().strftime("%Y-%m-%d %H:%M:%S"),"type":"expense","category":f"{self.combo_exp_cat.get()} - {desc}","amount":amt,"currency":curr}
-        if self.add_transaction_to_db(t): self.e_exp_desc.delete(0,'end'); self.e_exp_amt.delete(0,'end'); self.show_success_native("Expense recorded.")
+        def done(): self.e_exp_desc.delete(0,'end'); self.e_exp_amt.delete(0,'end'); self.show_success_native("Expense recorded.")
+        self.add_transaction_to_db(t, done)
 
     def manage_savings(self):
         try:
@@ -828,13 +1123,14 @@ class FinancialTrackerApp(ctk.CTk):
         curr = self.combo_sav_curr.get(); act = self.combo_sav_act.get()
         tt = 'savings_deposit' if 'Lock' in act else 'savings_withdraw'
         bk = self._bal_key(curr); lk = bk + "_locked"
-        self._cached_stats = None; s = self.calculate_stats()
+        s = self.calculate_stats()
         if tt == 'savings_deposit':
             if s[bk] < amt: self.show_error_native(f"Insufficient available {curr}."); return
         else:
             if s[lk] < amt: self.show_error_native(f"Insufficient locked {curr}."); return
         t = {"id":str(uuid.uuid4()),"date":datetime.now().strftime("%Y-%m-%d %H:%M:%S"),"type":tt,"amount":amt,"currency":curr}
-        if self.add_transaction_to_db(t): self.e_sav.delete(0,'end'); self.show_success_native("Vault updated.")
+        def done(): self.e_sav.delete(0,'end'); self.show_success_native("Vault updated.")
+        self.add_transaction_to_db(t, done)
 
     def add_loan(self):
         who = self.e_loan_who.get().strip()
@@ -846,9 +1142,10 @@ class FinancialTrackerApp(ctk.CTk):
         curr = self.combo_loan_curr.get(); notes = self.txt_loan.get("1.0","end-1c").strip()
         if not self._check_bal(curr, amt): return
         t = {"id":str(uuid.uuid4()),"date":datetime.now().strftime("%Y-%m-%d %H:%M:%S"),"type":"loan_out","borrower":who,"amount":amt,"currency":curr,"notes":notes,"status":"active"}
-        if self.add_transaction_to_db(t):
+        def done():
             self.e_loan_who.delete(0,'end'); self.e_loan_amt.delete(0,'end'); self.txt_loan.delete("1.0","end")
             self.show_success_native(f"Loan to {who} recorded.")
+        self.add_transaction_to_db(t, done)
 
     def mark_repaid(self, loan):
         d = ctk.CTkToplevel(self); d.title("Confirm"); d.geometry("420x220"); d.configure(fg_color=COLOR_CARD); d.attributes('-topmost', True)
@@ -861,10 +1158,25 @@ class FinancialTrackerApp(ctk.CTk):
         ctk.CTkLabel(d, text="Funds return to your available balance.", font=FONT_TINY, text_color=COLOR_TEXT_DIM).pack(pady=(0,15))
         def confirm():
             d.destroy()
-            rt = {"id":str(uuid.uuid4()),"date":datetime.now().strftime("%Y-%m-%d %H:%M:%S"),"type":"loan_repaid","borrower":who,"amount":amt,"currency":curr,"original_loan_id":loan['id'],"notes":f"Repayment from {who}"}
-            if self.add_transaction_to_db(rt):
-                ul = dict(loan); ul['status'] = 'repaid'; ul['repaid_date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                self.update_transaction_in_db(ul); self.show_success_native(f"{who} marked repaid.")
+            if self._saving: return
+            self._saving = True
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            rt = {"id":str(uuid.uuid4()),"date":now,"type":"loan_repaid","borrower":who,"amount":amt,"currency":curr,"original_loan_id":loan['id'],"notes":f"Repayment from {who}"}
+            ul = dict(loan); ul.pop('_row', None); ul['status'] = 'repaid'; ul['repaid_date'] = now
+            def work():
+                # Repayment row and loan status commit together, so a failure can't leave one without the other.
+                with self.db_cursor() as cur:
+                    cur.execute(INSERT_TX_SQL, _tx_row(rt)); cur.execute(UPDATE_TX_SQL, (_payload(ul), ul['id']))
+                    return self._bump_version(cur)
+            def done(v):
+                self._saving = False
+                if self._saw_own_write(v):
+                    self._track(rt); ex = self.tx_by_id.get(ul['id'])
+                    if ex is not None: self._retrack(ex, ul)
+                self.schedule_refresh(); self.show_success_native(f"{who} marked repaid.")
+            def failed(e):
+                self._saving = False; self.show_error_native(f"Save failed:\n{e}")
+            self._submit(work, done, failed)
         bf = ctk.CTkFrame(d, fg_color="transparent"); bf.pack(pady=10)
         ctk.CTkButton(bf, text="Cancel", width=120, height=40, corner_radius=12, fg_color=COLOR_INPUT, hover_color=COLOR_HOVER, command=d.destroy).pack(side="left", padx=8)
         ctk.CTkButton(bf, text="Confirm Repaid", width=140, height=40, corner_radius=12, fg_color=COLOR_SUCCESS, hover_color=COLOR_SUCCESS_DIM, font=FONT_BOLD, command=confirm).pack(side="right", padx=8)
@@ -872,12 +1184,15 @@ class FinancialTrackerApp(ctk.CTk):
     # ================================================================
     # LIST ROW
     # ================================================================
-    def create_list_row(self, parent, t, simple=False):
+    def row_strings(self, t):
+        """(main, sub, amount, amount_sub, colour) for one history row, cached on t until the display rates change."""
+        rates = self.get_rates(); cached = t.get('_row')
+        if cached is None or cached[0] != rates: cached = t['_row'] = (rates, self._build_row_strings(t, *rates))
+        return cached[1]
+
+    def _build_row_strings(self, t, ur, er):
         tt = t.get('type',''); td = str(t.get('date',''))[:10]; c = t.get('currency','USD')
-        ur, er = self.get_rates()
-        def sf(k):
-            try: return float(t.get(k, 0))
-            except: return 0.0
+        sf = lambda k: _sf(t, k)
         net = sf('net_amount'); base = sf('amount')
         if net == 0: net = base
         sym = self._sym(c)
@@ -925,60 +1240,75 @@ class FinancialTrackerApp(ctk.CTk):
             amt_t = f"+ {famt(base,c)}"; amt_s = feq(base,c); col = COLOR_SUCCESS
         else:
             main_t = "Transfer"; sub_t = td; amt_t = "Processed"; col = COLOR_PRIMARY
+        return main_t, sub_t, amt_t, amt_s, col
 
-        outer = ctk.CTkFrame(parent, fg_color=COLOR_CARD, corner_radius=12, border_width=1, border_color=COLOR_BORDER); outer.pack(fill="x", pady=3)
+    def create_list_row(self, parent, t, simple=False):
+        """Build (but don't pack) a history row; the labels are kept on the frame so update_list_row can reuse it."""
+        main_t, sub_t, amt_t, amt_s, col = strs = self.row_strings(t)
+        outer = ctk.CTkFrame(parent, fg_color=COLOR_CARD, corner_radius=12, border_width=1, border_color=COLOR_BORDER)
         inner = ctk.CTkFrame(outer, fg_color="transparent"); inner.pack(fill="x")
         df = ctk.CTkFrame(inner, fg_color="transparent", width=20); df.pack(side="left", padx=(12,0), pady=14)
         ctk.CTkFrame(df, width=8, height=8, corner_radius=4, fg_color=col).pack()
         tf = ctk.CTkFrame(inner, fg_color="transparent"); tf.pack(side="left", padx=(8,10), pady=10)
-        ctk.CTkLabel(tf, text=main_t, font=("Segoe UI Semibold",14), text_color=COLOR_TEXT_MAIN).pack(anchor="w")
-        ctk.CTkLabel(tf, text=sub_t, font=("Segoe UI",12), text_color=COLOR_TEXT_SUB).pack(anchor="w")
+        outer.main_lbl = ctk.CTkLabel(tf, text=main_t, font=("Segoe UI Semibold",14), text_color=COLOR_TEXT_MAIN); outer.main_lbl.pack(anchor="w")
+        outer.sub_lbl = ctk.CTkLabel(tf, text=sub_t, font=("Segoe UI",12), text_color=COLOR_TEXT_SUB); outer.sub_lbl.pack(anchor="w")
         if not simple:
             ctk.CTkButton(inner, text="×", width=28, height=28, corner_radius=8, fg_color="transparent", hover_color=COLOR_DANGER, font=("Segoe UI",16), text_color=COLOR_TEXT_DIM, command=lambda _id=t.get('id',''): self.delete_transaction(_id)).pack(side="right", padx=(4,12))
         af = ctk.CTkFrame(inner, fg_color="transparent"); af.pack(side="right", padx=12, pady=10)
-        ctk.CTkLabel(af, text=amt_t, font=("Segoe UI Bold",15), text_color=col).pack(anchor="e")
-        if amt_s: ctk.CTkLabel(af, text=amt_s, font=("Segoe UI",13), text_color=COLOR_TEXT_SUB).pack(anchor="e")
+        outer.amt_lbl = ctk.CTkLabel(af, text=amt_t, font=("Segoe UI Bold",15), text_color=col); outer.amt_lbl.pack(anchor="e")
+        outer.amt_s_lbl = ctk.CTkLabel(af, text=amt_s, font=("Segoe UI",13), text_color=COLOR_TEXT_SUB)
+        if amt_s: outer.amt_s_lbl.pack(anchor="e")
+        outer.strs = strs
+        return outer
+
+    def update_list_row(self, row, t):
+        strs = self.row_strings(t)
+        if strs == row.strs: return
+        main_t, sub_t, amt_t, amt_s, _ = strs
+        row.main_lbl.configure(text=main_t); row.sub_lbl.configure(text=sub_t); row.amt_lbl.configure(text=amt_t)
+        row.amt_s_lbl.configure(text=amt_s)
+        if amt_s: row.amt_s_lbl.pack(anchor="e")
+        else: row.amt_s_lbl.pack_forget()
+        row.strs = strs
+
+    def history_list(self, parent, simple=False):
+        return VirtualListFrame(parent, lambda p, t: self.create_list_row(p, t, simple), self.update_list_row, fg_color="transparent", scrollbar_button_color=COLOR_BORDER)
 
     # ================================================================
     # LIST UPDATES
     # ================================================================
+    def list_rows(self, kind):
+        """Newest-first rows for one history list; income/expense only walk the selected month's bucket."""
+        if kind == "income" or kind == "expense": return [t for t in reversed(self.month_rows()) if t.get('type','') == kind]
+        if kind == "loan": return [t for t in reversed(self.tx_by_id.values()) if t.get('type','') == 'loan_out']
+        return [t for t in reversed(self.tx_by_id.values()) if kind in str(t.get('type',''))]
+
+    def _update_list(self, name):
+        """Rebuild one frame's history list and clear its dirty flag."""
+        self._dirty.discard(name)
+        {"dashboard": self.update_dashboard_history, "income": self.update_income_list, "expenses": self.update_expense_list,
+         "transfer": self.update_transfer_list, "savings": self.update_savings_list, "lending": self.update_lending_list}[name]()
+
     def update_income_list(self):
-        for w in self.income_list.winfo_children(): w.destroy()
-        mk = self.get_monthly_key(); found = False
-        for t in reversed(self.data.get("transactions",[])):
-            if t.get('type')=='income' and str(t.get('date','')).startswith(mk): self.create_list_row(self.income_list, t); found = True
-        if not found: ctk.CTkLabel(self.income_list, text="No income this month.", font=FONT_MAIN, text_color=COLOR_TEXT_DIM).pack(pady=30)
+        self.income_list.set_items(self.list_rows("income"), "No income this month.")
 
     def update_expense_list(self):
-        for w in self.expense_list.winfo_children(): w.destroy()
-        mk = self.get_monthly_key(); found = False
-        for t in reversed(self.data.get("transactions",[])):
-            if t.get('type')=='expense' and str(t.get('date','')).startswith(mk): self.create_list_row(self.expense_list, t); found = True
-        if not found: ctk.CTkLabel(self.expense_list, text="No expenses this month.", font=FONT_MAIN, text_color=COLOR_TEXT_DIM).pack(pady=30)
+        self.expense_list.set_items(self.list_rows("expense"), "No expenses this month.")
 
     def update_transfer_list(self):
-        for w in self.transfer_list.winfo_children(): w.destroy()
-        found = False
-        for t in reversed(self.data.get("transactions",[])):
-            if 'transfer' in str(t.get('type','')): self.create_list_row(self.transfer_list, t); found = True
-        if not found: ctk.CTkLabel(self.transfer_list, text="No transfers yet.", font=FONT_MAIN, text_color=COLOR_TEXT_DIM).pack(pady=30)
+        self.transfer_list.set_items(self.list_rows("transfer"), "No transfers yet.")
 
     def update_savings_list(self):
         if not hasattr(self, 'savings_list'): return
-        for w in self.savings_list.winfo_children(): w.destroy()
-        found = False
-        for t in reversed(self.data.get("transactions",[])):
-            if 'savings' in str(t.get('type','')): self.create_list_row(self.savings_list, t); found = True
-        if not found: ctk.CTkLabel(self.savings_list, text="No savings yet.", font=FONT_MAIN, text_color=COLOR_TEXT_DIM).pack(pady=30)
+        self.savings_list.set_items(self.list_rows("savings"), "No savings yet.")
 
     def update_lending_list(self):
         if not hasattr(self, 'lending_list'): return
         for w in self.lending_list.winfo_children(): w.destroy()
         fv = self.combo_loan_filter.get(); ur, er = self.get_rates()
-        loans = [t for t in self.data.get("transactions",[]) if t.get('type')=='loan_out']
+        loans = self.list_rows("loan")
         if fv == "Active": loans = [l for l in loans if l.get('status','active')=='active']
         elif fv == "Repaid": loans = [l for l in loans if l.get('status')=='repaid']
-        loans.sort(key=lambda x: str(x.get('date','')), reverse=True)
         if not loans:
             msg = {"Active":"No active loans.","Repaid":"No repaid loans.","All":"No loans yet."}.get(fv,"No loans.")
             ctk.CTkLabel(self.lending_list, text=msg, font=FONT_MAIN, text_color=COLOR_TEXT_DIM).pack(pady=30); return